@@ -1,5 +1,7 @@
 from pyomo.environ import *
 import pandas as pd
+from resolucion import resolver_modelo
+from zonas import cargar_zonas, etiquetar_nodos, nodos_permitidos
 
 # Lectura de datos
 clients_df = pd.read_csv('vrp_case_data/case_5_recharge_nodes/Clients.csv')
@@ -24,6 +26,10 @@ vehicles_df['BatteryCapacity'] = vehicles_df['Range'] / 10
 recharge_nodes_df['RechargeRate'] = 5
 recharge_nodes_df['RechargeCost'] = 500
 
+# Reglas por zona urbana (AUrb): zonas donde no puede operar cada tipo de vehículo
+# ("*" = cualquier zona urbana, p. ej. {'drone': '*'} para zonas de no vuelo)
+zonas_prohibidas = {}
+
 # Modelo
 model = ConcreteModel()
 
@@ -59,6 +65,19 @@ model.recharge_rate = Param(model.R, initialize=recharge_rate, doc="Tasa de reca
 model.y = Var(model.N, model.N, model.V, domain=Binary, doc="Flujo de vehículos entre nodos")
 model.u = Var(model.N, model.V, domain=NonNegativeReals, doc="Subtour elimination")
 
+# Etiquetar clientes, depósitos y nodos de recarga con su zona y fijar en 0 los arcos que
+# tocan un nodo prohibido para el vehículo, de modo que no lleguen al solver
+if zonas_prohibidas:
+    zonas = cargar_zonas()
+    node_zones = etiquetar_nodos(zonas, [coordinates[n][0] for n in nodes], [coordinates[n][1] for n in nodes])
+    allowed = nodos_permitidos(node_zones, list(model.V), zonas_prohibidas)
+    for i, n in enumerate(nodes):
+        for k, v in enumerate(model.V):
+            if not allowed[i, k]:
+                for m in nodes:
+                    model.y[n, m, v].fix(0)
+                    model.y[m, n, v].fix(0)
+
 # Función objetivo
 def objective_rule(model):
     return sum(
@@ -109,8 +128,7 @@ def capacity_rule(model, v):
 model.capacity_constraint = Constraint(model.V, rule=capacity_rule)
 
 # Resolución
-solver = SolverFactory('glpk')
-solver.solve(model, tee=True, timelimit=120)
+resolver_modelo(model, 'glpk', timelimit=120, tee=True)
 
 # Generar rutas con etiquetas
 routes = []
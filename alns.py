@@ -0,0 +1,476 @@
+import os
+import math
+import random
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from costos import haversine_matriz
+from ventanas import leer_ventanas, RutaVentanas
+
+# Parámetros asumidos para la recarga (los mismos de Modelo_CasoEspecial1.py)
+recharge_rate = 5       # kWh/min
+recharge_cost = 500     # COP/kWh
+
+# Velocidad promedio en km/h para convertir distancias en tiempos (ventanas de tiempo)
+velocidad = 60
+
+# Rutas evaluadas que se guardan en memoria por proceso (se descartan las menos recientes)
+TAMANO_CACHE = 20000
+
+# Penalización por cliente sin atender
+PENALIZACION = 1e7
+
+# Puntajes de los operadores: nueva mejor global, mejora la actual, aceptada sin mejorar
+PUNTAJES = (33, 9, 13)
+
+
+class Instancia:
+    """
+    Datos de un caso en arreglos indexados por nodo: depósitos, luego clientes y luego
+    nodos de recarga. Cada fila de Vehicles.csv es un vehículo que puede hacer hasta
+    `viajes` rutas, cada una desde un depósito y con la capacidad completa del vehículo. Los
+    viajes no se encadenan en el tiempo, por lo que con ventanas de tiempo se exige un viaje.
+    """
+
+    def __init__(self, carpeta, viajes=3):
+        clients = pd.read_csv(os.path.join(carpeta, "Clients.csv"))
+        depots = pd.read_csv(os.path.join(carpeta, "Depots.csv"))
+        vehicles = pd.read_csv(os.path.join(carpeta, "Vehicles.csv"))
+        ruta_recarga = os.path.join(carpeta, "RechargeNodes.csv")
+        recharge_nodes = pd.read_csv(ruta_recarga) if os.path.exists(ruta_recarga) else clients.iloc[0:0]
+
+        self.D, self.C, self.R = len(depots), len(clients), len(recharge_nodes)
+        self.depositos = list(range(self.D))
+        self.clientes = list(range(self.D, self.D + self.C))
+        self.recargas = np.arange(self.D + self.C, self.D + self.C + self.R)
+        self.nombres = ([f"NBodega{i}" for i in depots["DepotID"]] + [f"NCliente{i}" for i in clients["ClientID"]]
+                        + [f"NRecarga{i}" for i in recharge_nodes.get("RechargeNodeID", [])])
+
+        # Demanda por producto: una columna "Product" o una por tipo de producto
+        self.productos = [p for p in clients.columns if p.startswith("Product")]
+        self.demanda = np.zeros((self.D + self.C + self.R, len(self.productos)))
+        self.demanda[self.D:self.D + self.C] = clients[self.productos].to_numpy(dtype=float)
+        self.demanda_total = self.demanda.sum(axis=1)
+
+        # Oferta de cada depósito por producto (sin límite si no aparece en DepotCapacities.csv)
+        self.oferta = np.full((self.D, len(self.productos)), np.inf)
+        ruta_capacidades = os.path.join(carpeta, "DepotCapacities.csv")
+        if os.path.exists(ruta_capacidades):
+            capacidades = pd.read_csv(ruta_capacidades).fillna(0).set_index("DepotID")
+            for i, depot_id in enumerate(depots["DepotID"]):
+                if depot_id in capacidades.index:
+                    self.oferta[i] = capacidades.loc[depot_id, self.productos].to_numpy(dtype=float)
+
+        # Flota: una ruta por viaje de cada vehículo
+        self.vehiculo = np.repeat(np.arange(len(vehicles)), viajes)
+        self.tipos = vehicles["VehicleType"].str.strip().to_numpy()[self.vehiculo].tolist()
+        self.capacidad = vehicles["Capacity"].to_numpy(dtype=float)[self.vehiculo]
+        self.rango = vehicles["Range"].to_numpy(dtype=float)[self.vehiculo]
+        bateria = self.rango / 10
+        self.costo_recarga = recharge_cost * bateria + bateria / recharge_rate if self.R else np.zeros(len(self.rango))
+        self.V = len(self.rango)
+
+        # Distancias Haversine entre todos los nodos y distancia de cada nodo a la recarga más cercana
+        lat = np.concatenate([depots["Latitude"], clients["Latitude"], recharge_nodes.get("Latitude", [])])
+        lon = np.concatenate([depots["Longitude"], clients["Longitude"], recharge_nodes.get("Longitude", [])])
+        self.dist = haversine_matriz(lat, lon, lat, lon)
+        self.recarga_cercana = self.dist[:, self.recargas].min(axis=1) if self.R else np.full(len(lat), np.inf)
+        self.depositos_cercanos = np.argsort(self.dist[:, :self.D], axis=1)
+
+        # Ventanas de tiempo opcionales: solo se verifican si Clients.csv las define. Cada viaje se
+        # evalúa desde el inicio de la jornada, contando el desvío y el tiempo de cada recarga
+        self.ventanas = "TimeWindowStart" in clients.columns or "TimeWindowEnd" in clients.columns
+        if self.ventanas and viajes > 1:
+            # Los viajes de un vehículo se evalúan por separado, todos desde el inicio de la jornada
+            raise ValueError("Con ventanas de tiempo cada vehículo solo puede hacer un viaje (use --viajes 1)")
+        if self.ventanas:
+            inicio, fin = leer_ventanas(clients)
+            self.inicio = [0.0] * self.D + inicio + [0.0] * self.R
+            self.fin = [math.inf] * self.D + fin + [math.inf] * self.R
+            self.tiempos = (self.dist / velocidad * 60).tolist()
+            # Tiempo de servicio por vehículo: cero en depósitos y clientes, la recarga completa en las estaciones
+            self.servicio = [[0.0] * (self.D + self.C) + [float(t)] * self.R for t in bateria / recharge_rate]
+
+        self._cache = OrderedDict()
+
+    def evaluar_ruta(self, v, d, clientes):
+        """
+        Costo de la ruta del vehículo v desde el depósito d, insertando de forma voraz las
+        paradas de recarga necesarias para respetar el rango. Devuelve (costo, secuencia) o
+        (inf, None) si la ruta no es factible, incluidas las ventanas de tiempo sobre la
+        secuencia con recargas.
+        """
+        clave = (v, d, tuple(clientes))
+        if clave in self._cache:
+            self._cache.move_to_end(clave)
+            return self._cache[clave]
+        resultado = self._evaluar(v, d, clientes)
+        self._cache[clave] = resultado
+        if len(self._cache) > TAMANO_CACHE:
+            self._cache.popitem(last=False)
+        return resultado
+
+    def _evaluar(self, v, d, clientes):
+        dist, rango = self.dist, self.rango[v]
+        secuencia, distancia, recargas, bateria, actual = [d], 0.0, 0, rango, d
+        for siguiente in list(clientes) + [d]:
+            # Desde el siguiente nodo debe poder alcanzarse el depósito o una estación de recarga
+            alcance = 0.0 if siguiente == d else min(dist[siguiente, d], self.recarga_cercana[siguiente])
+            if dist[actual, siguiente] + alcance > bateria:
+                candidatas = self.recargas[(dist[actual, self.recargas] <= bateria)
+                                           & (dist[self.recargas, siguiente] + alcance <= rango)]
+                if len(candidatas) == 0:
+                    return math.inf, None
+                r = int(candidatas[np.argmin(dist[actual, candidatas] + dist[candidatas, siguiente])])
+                distancia += dist[actual, r]
+                secuencia.append(r)
+                recargas, bateria, actual = recargas + 1, rango, r
+            distancia += dist[actual, siguiente]
+            bateria -= dist[actual, siguiente]
+            secuencia.append(siguiente)
+            actual = siguiente
+
+        if self.ventanas and not RutaVentanas(secuencia, self.tiempos, self.inicio, self.fin, self.servicio[v]).factible:
+            return math.inf, None
+        return distancia + recargas * self.costo_recarga[v], secuencia
+
+
+class Solucion:
+    """
+    Una ruta por vehículo (lista de clientes), el depósito de cada ruta y los clientes sin
+    atender, con la carga de cada vehículo y el uso de la oferta de cada depósito.
+    """
+
+    def __init__(self, inst):
+        self.rutas = [[] for _ in range(inst.V)]
+        self.deposito = [None] * inst.V
+        self.costos = [0.0] * inst.V
+        self.carga = np.zeros(inst.V)
+        self.uso = np.zeros_like(inst.oferta)
+        self.ruta_de = {}
+        self.sin_asignar = set(inst.clientes)
+        self.ventanas = [None] * inst.V
+
+    def __getstate__(self):
+        # Las estructuras de ventanas se reconstruyen bajo demanda en cada proceso
+        estado = self.__dict__.copy()
+        estado["ventanas"] = [None] * len(self.rutas)
+        return estado
+
+    def copia(self):
+        nueva = Solucion.__new__(Solucion)
+        nueva.rutas = list(self.rutas)
+        nueva.deposito = list(self.deposito)
+        nueva.costos = list(self.costos)
+        nueva.carga = self.carga.copy()
+        nueva.uso = self.uso.copy()
+        nueva.ruta_de = dict(self.ruta_de)
+        nueva.sin_asignar = set(self.sin_asignar)
+        nueva.ventanas = list(self.ventanas)
+        return nueva
+
+    def costo(self):
+        return sum(self.costos) + PENALIZACION * len(self.sin_asignar)
+
+    def ventana(self, inst, v):
+        # Sin recargas: las paradas de recarga solo agregan tiempo, así que sirve como filtro
+        # rápido y evaluar_ruta verifica la secuencia completa
+        if self.ventanas[v] is None:
+            d = self.deposito[v]
+            self.ventanas[v] = RutaVentanas([d] + self.rutas[v] + [d], inst.tiempos, inst.inicio, inst.fin)
+        return self.ventanas[v]
+
+    def _cambiar_ruta(self, inst, v, clientes):
+        # Las rutas no se modifican en sitio para que las copias puedan compartirlas
+        self.rutas[v] = clientes
+        self.ventanas[v] = None
+        if clientes:
+            self.costos[v] = inst.evaluar_ruta(v, self.deposito[v], clientes)[0]
+        else:
+            self.costos[v], self.deposito[v] = 0.0, None
+
+    def quitar(self, inst, c):
+        v = self.ruta_de.pop(c)
+        self.carga[v] -= inst.demanda_total[c]
+        self.uso[self.deposito[v]] -= inst.demanda[c]
+        self.sin_asignar.add(c)
+        self._cambiar_ruta(inst, v, [n for n in self.rutas[v] if n != c])
+
+    def insertar(self, inst, c, v, pos, d):
+        if not self.rutas[v]:
+            self.deposito[v] = d
+        self.ruta_de[c] = v
+        self.carga[v] += inst.demanda_total[c]
+        self.uso[self.deposito[v]] += inst.demanda[c]
+        self.sin_asignar.discard(c)
+        self._cambiar_ruta(inst, v, self.rutas[v][:pos] + [c] + self.rutas[v][pos:])
+
+
+# Operadores de destrucción
+
+def remocion_aleatoria(inst, sol, q, rng):
+    return rng.sample(list(sol.ruta_de), min(q, len(sol.ruta_de)))
+
+
+def remocion_peor(inst, sol, q, rng, p=3):
+    """
+    Quita los clientes cuyo desvío en su ruta es mayor, con aleatoriedad controlada por p.
+    """
+    ahorros = []
+    for v, ruta in enumerate(sol.rutas):
+        nodos = [sol.deposito[v]] + ruta + [sol.deposito[v]]
+        for k in range(1, len(nodos) - 1):
+            i, c, j = nodos[k - 1], nodos[k], nodos[k + 1]
+            ahorros.append((inst.dist[i, c] + inst.dist[c, j] - inst.dist[i, j], c))
+    ahorros.sort(reverse=True)
+    quitados = []
+    while ahorros and len(quitados) < q:
+        quitados.append(ahorros.pop(int(rng.random() ** p * len(ahorros)))[1])
+    return quitados
+
+
+def remocion_shaw(inst, sol, q, rng, p=6):
+    """
+    Remoción relacionada (Shaw): a partir de un cliente al azar quita los clientes más
+    parecidos en ubicación y demanda, que luego pueden reinsertarse intercambiados.
+    """
+    asignados = list(sol.ruta_de)
+    if not asignados:
+        return []
+    escala_dist = inst.dist.max() or 1.0
+    escala_demanda = inst.demanda_total.max() or 1.0
+    quitados = [asignados.pop(rng.randrange(len(asignados)))]
+    while asignados and len(quitados) < q:
+        r = rng.choice(quitados)
+        relacion = (inst.dist[r, asignados] / escala_dist
+                    + np.abs(inst.demanda_total[asignados] - inst.demanda_total[r]) / escala_demanda
+                    + 0.1 * (np.array([sol.ruta_de[c] for c in asignados]) != sol.ruta_de[r]))
+        orden = np.argsort(relacion)
+        quitados.append(asignados.pop(int(orden[int(rng.random() ** p * len(orden))])))
+    return quitados
+
+
+# Operadores de reparación
+
+def inserciones(inst, sol, c):
+    """
+    Mejor inserción factible del cliente en cada ruta: lista de (costo, v, pos, d). Las rutas
+    vacías equivalentes (mismo tipo, capacidad y rango) se evalúan una sola vez.
+    """
+    opciones = []
+    vacias = set()
+    dist, demanda = inst.dist, inst.demanda[c]
+    for v, ruta in enumerate(sol.rutas):
+        if sol.carga[v] + inst.demanda_total[c] > inst.capacidad[v]:
+            continue
+        if not ruta:
+            firma = (inst.tipos[v], inst.capacidad[v], inst.rango[v])
+            if firma in vacias:
+                continue
+            vacias.add(firma)
+            # Los tres depósitos más cercanos que todavía tienen oferta para el cliente
+            mejor, probados = None, 0
+            for d in inst.depositos_cercanos[c]:
+                d = int(d)
+                if np.any(sol.uso[d] + demanda > inst.oferta[d]):
+                    continue
+                if probados == 3:
+                    break
+                probados += 1
+                if inst.ventanas and not RutaVentanas([d, c, d], inst.tiempos, inst.inicio, inst.fin).factible:
+                    continue
+                costo = inst.evaluar_ruta(v, d, [c])[0]
+                if costo < math.inf and (mejor is None or costo < mejor[0]):
+                    mejor = (costo, v, 0, d)
+            if mejor is not None:
+                opciones.append(mejor)
+            continue
+
+        d = sol.deposito[v]
+        if np.any(sol.uso[d] + demanda > inst.oferta[d]):
+            continue
+        nodos = [d] + ruta + [d]
+        # Posiciones ordenadas por el desvío en distancia; la de recargas se evalúa solo en las mejores
+        desvios = sorted((dist[nodos[k - 1], c] + dist[c, nodos[k]] - dist[nodos[k - 1], nodos[k]], k - 1)
+                         for k in range(1, len(nodos)))
+        evaluadas, mejor = 0, None
+        for _, pos in desvios:
+            if inst.ventanas and not sol.ventana(inst, v).puede_insertar(c, pos + 1):
+                continue
+            costo = inst.evaluar_ruta(v, d, ruta[:pos] + [c] + ruta[pos:])[0] - sol.costos[v]
+            if costo < math.inf and (mejor is None or costo < mejor[0]):
+                mejor = (costo, v, pos, d)
+            evaluadas += 1
+            if evaluadas == 3:
+                break
+        if mejor is not None:
+            opciones.append(mejor)
+    return opciones
+
+
+def insercion_voraz(inst, sol, clientes, rng):
+    rng.shuffle(clientes)
+    for c in clientes:
+        opciones = inserciones(inst, sol, c)
+        if opciones:
+            _, v, pos, d = min(opciones)
+            sol.insertar(inst, c, v, pos, d)
+
+
+def insercion_regret(inst, sol, clientes, rng, k=2):
+    """
+    Inserta primero el cliente con mayor arrepentimiento: la diferencia entre su mejor
+    inserción y la k-ésima mejor en otra ruta.
+    """
+    pendientes = list(clientes)
+    while pendientes:
+        elegido, mayor = None, -math.inf
+        for c in pendientes:
+            opciones = sorted(inserciones(inst, sol, c))
+            if not opciones:
+                continue
+            arrepentimiento = (opciones[k - 1][0] if len(opciones) >= k else PENALIZACION) - opciones[0][0]
+            if arrepentimiento > mayor:
+                elegido, mayor = (c, opciones[0]), arrepentimiento
+        if elegido is None:
+            break
+        c, (_, v, pos, d) = elegido
+        sol.insertar(inst, c, v, pos, d)
+        pendientes.remove(c)
+
+
+REMOCIONES = [remocion_aleatoria, remocion_peor, remocion_shaw]
+INSERCIONES = [insercion_voraz, insercion_regret]
+
+
+def _ruleta(pesos, rng):
+    return rng.choices(range(len(pesos)), weights=pesos)[0]
+
+
+def iterar(inst, estado, iteraciones, segmento=50, reaccion=0.2, enfriamiento=0.9995):
+    """
+    Corre iteraciones de ALNS sobre el estado de un trabajador: destruye y repara con
+    operadores elegidos por ruleta, acepta con recocido simulado y ajusta los pesos de los
+    operadores al final de cada segmento según su desempeño.
+    """
+    rng = estado["rng"]
+    actual, mejor = estado["actual"], estado["mejor"]
+    puntos_rem, usos_rem = [0.0] * len(REMOCIONES), [0] * len(REMOCIONES)
+    puntos_ins, usos_ins = [0.0] * len(INSERCIONES), [0] * len(INSERCIONES)
+
+    for it in range(1, iteraciones + 1):
+        r = _ruleta(estado["pesos_rem"], rng)
+        i = _ruleta(estado["pesos_ins"], rng)
+        candidata = actual.copia()
+        q = rng.randint(1, max(1, int(0.3 * inst.C)))
+        for c in REMOCIONES[r](inst, candidata, q, rng):
+            candidata.quitar(inst, c)
+        INSERCIONES[i](inst, candidata, list(candidata.sin_asignar), rng)
+
+        puntaje = 0
+        delta = candidata.costo() - actual.costo()
+        if candidata.costo() < mejor.costo() - 1e-9:
+            mejor, actual, puntaje = candidata, candidata, PUNTAJES[0]
+        elif delta < -1e-9:
+            actual, puntaje = candidata, PUNTAJES[1]
+        elif rng.random() < math.exp(-delta / max(estado["temperatura"], 1e-9)):
+            actual, puntaje = candidata, PUNTAJES[2]
+        estado["temperatura"] *= enfriamiento
+
+        puntos_rem[r] += puntaje
+        usos_rem[r] += 1
+        puntos_ins[i] += puntaje
+        usos_ins[i] += 1
+        if it % segmento == 0:
+            for pesos, puntos, usos in [(estado["pesos_rem"], puntos_rem, usos_rem), (estado["pesos_ins"], puntos_ins, usos_ins)]:
+                for k in range(len(pesos)):
+                    if usos[k]:
+                        pesos[k] = max((1 - reaccion) * pesos[k] + reaccion * puntos[k] / usos[k], 0.1)
+                    puntos[k], usos[k] = 0.0, 0
+
+    estado["actual"], estado["mejor"] = actual, mejor
+    return estado
+
+
+# Instancia compartida por los procesos de trabajo: se envía una sola vez al crear cada proceso
+_instancia = None
+
+
+def _iniciar_trabajador(inst):
+    global _instancia
+    _instancia = inst
+
+
+def _correr_epoca(tarea):
+    semilla, estado, iteraciones = tarea
+    inst = _instancia
+    if estado is None:
+        rng = random.Random(semilla)
+        inicial = Solucion(inst)
+        insercion_regret(inst, inicial, list(inicial.sin_asignar), rng)
+        estado = {
+            "rng": rng,
+            "actual": inicial,
+            "mejor": inicial,
+            "pesos_rem": [1.0] * len(REMOCIONES),
+            "pesos_ins": [1.0] * len(INSERCIONES),
+            # Temperatura inicial: aceptar con probabilidad 1/2 una solución 5% peor
+            "temperatura": 0.05 * sum(inicial.costos) / math.log(2),
+        }
+    return iterar(inst, estado, iteraciones)
+
+
+def resolver(inst, semillas=4, epocas=10, iteraciones=200, procesos=None):
+    """
+    ALNS multi-inicio: cada semilla corre en un proceso independiente y al final de cada
+    época la mejor solución global se comparte con los trabajadores que quedaron atrás.
+    """
+    estados = [None] * semillas
+    mejor = None
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador, initargs=(inst,)) as pool:
+        for epoca in range(1, epocas + 1):
+            estados = list(pool.map(_correr_epoca, [(s, estados[s], iteraciones) for s in range(semillas)]))
+            mejor = min((e["mejor"] for e in estados), key=Solucion.costo)
+            for e in estados:
+                if e["mejor"].costo() > mejor.costo() + 1e-9:
+                    e["actual"], e["mejor"] = mejor.copia(), mejor.copia()
+            print(f"Época {epoca}: costo {mejor.costo():.2f}, clientes sin atender {len(mejor.sin_asignar)}")
+    return mejor
+
+
+def rutas_df(inst, sol):
+    """
+    Arcos de la solución en el formato de los archivos de rutas, con las paradas de recarga.
+    """
+    routes = []
+    for v, ruta in enumerate(sol.rutas):
+        if not ruta:
+            continue
+        secuencia = inst.evaluar_ruta(v, sol.deposito[v], ruta)[1]
+        for o, d in zip(secuencia[:-1], secuencia[1:]):
+            routes.append([f"{inst.tipos[v]} {inst.vehiculo[v] + 1}", inst.nombres[o], inst.nombres[d]])
+    return pd.DataFrame(routes, columns=['ID-Vehiculo', 'ID-Origen', 'ID-Destino'])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ALNS multi-inicio para los casos con oferta, multiproducto y recarga")
+    parser.add_argument("--caso", default="vrp_case_data/case_5_recharge_nodes")
+    parser.add_argument("--semillas", type=int, default=4)
+    parser.add_argument("--epocas", type=int, default=10)
+    parser.add_argument("--iteraciones", type=int, default=200, help="Iteraciones por época y semilla")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--viajes", type=int, default=3, help="Rutas máximas por vehículo (1 si hay ventanas de tiempo)")
+    parser.add_argument("--salida", default=None, help="Por defecto ./rutas/grupo8-alns-<carpeta del caso>-ruta.csv")
+    opciones = parser.parse_args()
+    if opciones.salida is None:
+        # exportar_mapa.py reconoce el caso a partir de este nombre
+        opciones.salida = f"./rutas/grupo8-alns-{os.path.basename(os.path.normpath(opciones.caso))}-ruta.csv"
+
+    inst = Instancia(opciones.caso, opciones.viajes)
+    mejor = resolver(inst, opciones.semillas, opciones.epocas, opciones.iteraciones, opciones.procesos)
+    if mejor.sin_asignar:
+        print("Clientes sin atender:", ", ".join(inst.nombres[c] for c in sorted(mejor.sin_asignar)))
+    rutas_df(inst, mejor).to_csv(opciones.salida, index=False)
+    print(f"Archivo generado: {opciones.salida}")
@@ -1,11 +1,13 @@
 import pandas as pd
 from pyomo.environ import *
 from pyomo.opt import SolverFactory
-import requests
+from resolucion import resolver_modelo
 import numpy as np
 import xml.etree.ElementTree as ET
 from tqdm import tqdm
-from math import radians, sin, cos, sqrt, atan2
+from costos import freight_rate, time_rate, daily_maintenance, tensores_viaje, tensor_costos, opciones_factibles, filtrar_dominadas, reporte_top_k
+from ventanas import leer_ventanas
+from zonas import cargar_zonas, etiquetar_nodos, nodos_permitidos, servicio_depositos
 
 clients = pd.read_csv("vrp_case_data/case_2_cost/clients.csv")
 depots = pd.read_csv("vrp_case_data/case_2_cost/depots.csv")
@@ -14,10 +16,13 @@ vehicles = pd.read_csv("vrp_case_data/case_2_cost/vehicles.csv")
 # Normalizar los nombres de los vehículos para evitar inconsistencias
 vehicles["VehicleType"] = vehicles["VehicleType"].str.strip().str.title()
 
-# Diccionarios de costos ajustados
-freight_rate = {"Gas Car": 5000, "Drone": 500, "Ev": 4000}
-time_rate = {"Gas Car": 500, "Drone": 500, "Ev": 500}
-daily_maintenance = {"Gas Car": 30000, "Drone": 3000, "Ev": 21000}
+# Reglas por zona urbana (AUrb): zonas donde no puede operar cada tipo de vehículo ("*" = cualquier
+# zona urbana, p. ej. {"Drone": "*"}) y zonas que atiende cada depósito (p. ej. {1: {"160379B002"}})
+zonas_prohibidas = {}
+areas_servicio = {}
+
+# Número de opciones por cliente en el reporte de costos
+TOP_K = 3
 
 # Crear el modelo
 model = ConcreteModel()
@@ -27,128 +32,80 @@ model.D = Set(initialize=depots["DepotID"].unique())
 model.C = Set(initialize=clients["ClientID"].unique())
 model.V = Set(initialize=vehicles["VehicleType"].unique())
 
-# Combinar coordenadas de depósitos y clientes para usar en OSRM
-all_coords = list(zip(depots["Longitude"], depots["Latitude"])) + list(zip(clients["Longitude"], clients["Latitude"]))
-
-
-# Función para obtener las distancias usando OSRM
-def osrm_distance(coords):
-    """
-    Calcula las distancias y duraciones usando el servicio OSRM para vehículos terrestres.
-    """
-    coords_str = ';'.join([f"{lon},{lat}" for lon, lat in coords])
-
-    url = f"https://router.project-osrm.org/table/v1/driving/{coords_str}"
-    params = {
-        'sources': ';'.join(map(str, range(len(coords)))),
-        'destinations': ';'.join(map(str, range(len(coords)))),
-        'annotations': 'distance,duration'
-    }
-
-    response = requests.get(url, params=params)
-
-    if response.status_code != 200:
-        raise RuntimeError(f"OSRM request failed: {response.status_code}, {response.text}")
-
-    data = response.json()
-    return np.array(data['distances'])/1000, np.array(data['durations'])/60
-
-
-# Cargar matrices de distancias y duraciones desde OSRM
-osrm_distance_matrix, osrm_duration_matrix = osrm_distance(all_coords)
+# Identificadores en el orden de las filas de los datos (ejes de las matrices)
+depot_ids = depots["DepotID"].tolist()
+client_ids = clients["ClientID"].tolist()
+vehicle_types = list(model.V)
 
-# Extraer submatrices para depósitos y clientes
-num_depots = len(depots)
-num_clients = len(clients)
+# Tensores D×C×V de distancias y tiempos de viaje en minutos: OSRM para vehículos terrestres,
+# línea recta a velocidad constante para vehículos aéreos
+distances, durations = tensores_viaje(depots, clients, vehicle_types)
 
-osrm_distances = osrm_distance_matrix[:num_depots, num_depots:]
-osrm_durations = osrm_duration_matrix[:num_depots, num_depots:]
+# Ventanas de tiempo opcionales por cliente (minutos desde el inicio de la jornada)
+_, window_end = leer_ventanas(clients)
 
+# Parámetros de capacidad y rango
+model.capacity = Param(model.V, initialize={v: vehicles.loc[vehicles["VehicleType"] == v, "Capacity"].iloc[0] for v in model.V})
+model.range = Param(model.V, initialize={v: vehicles.loc[vehicles["VehicleType"] == v, "Range"].iloc[0] for v in model.V})
 
-# Función Haversine para distancias en línea recta
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371  # Radio de la Tierra en kilómetros
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c  # Distancia en kilómetros
+# Tensor de costos calculado una sola vez
+costs = tensor_costos(distances, durations / 60, vehicle_types, freight_rate, time_rate, daily_maintenance)
 
+# Solo las opciones dentro del rango del vehículo, que llegan antes del cierre de la ventana
+# del cliente (si llega antes de la apertura, espera) y no dominadas se convierten en variables
+capacities = np.array([model.capacity[v] for v in vehicle_types])
+ranges = np.array([model.range[v] for v in vehicle_types])
+feasible = opciones_factibles(distances, durations, ranges, window_end)
 
-# Inicializar distancias entre depósitos y clientes
-def initialize_distances(model, d, c, v):
-    depot_idx = depots[depots["DepotID"] == d].index[0]
-    client_idx = clients[clients["ClientID"] == c].index[0]
+# Combinaciones (nodo, vehículo) y (depósito, cliente) prohibidas por las reglas de zona
+if zonas_prohibidas or areas_servicio:
+    zonas = cargar_zonas()
+    depot_zones = etiquetar_nodos(zonas, depots["Longitude"], depots["Latitude"])
+    client_zones = etiquetar_nodos(zonas, clients["Longitude"], clients["Latitude"])
+    feasible &= nodos_permitidos(depot_zones, vehicle_types, zonas_prohibidas)[:, None, :]
+    feasible &= nodos_permitidos(client_zones, vehicle_types, zonas_prohibidas)[None, :, :]
+    feasible &= servicio_depositos(depot_ids, client_zones, areas_servicio)[:, :, None]
 
-    if v in ["Gas Car", "Ev"]:
-        # Usar OSRM para vehículos terrestres
-        return osrm_distances[depot_idx, client_idx]
-    elif v == "Drone":
-        # Usar Haversine para vehículos aéreos
-        depot_coords = (depots.loc[depot_idx, "Latitude"], depots.loc[depot_idx, "Longitude"])
-        client_coords = (clients.loc[client_idx, "Latitude"], clients.loc[client_idx, "Longitude"])
-        return haversine(depot_coords[0], depot_coords[1], client_coords[0], client_coords[1])
+keep = filtrar_dominadas(costs, feasible, capacities)
 
+options = {}
+for i, j, k in zip(*np.nonzero(keep)):
+    options[depot_ids[i], client_ids[j], vehicle_types[k]] = float(costs[i, j, k])
 
-model.distances = Param(model.D, model.C, model.V, initialize=initialize_distances, within=NonNegativeReals)
+client_options = {c: [] for c in model.C}
+for d, c, v in options:
+    client_options[c].append((d, c, v))
 
-# Parámetros de capacidad y rango
-model.capacity = Param(model.V, initialize={v: vehicles.loc[vehicles["VehicleType"] == v, "Capacity"].iloc[0] for v in model.V})
-model.range = Param(model.V, initialize={v: vehicles.loc[vehicles["VehicleType"] == v, "Range"].iloc[0] for v in model.V})
+model.A = Set(initialize=list(options), dimen=3, doc="Opciones (depósito, cliente, vehículo) no dominadas")
+model.cost = Param(model.A, initialize=options, within=NonNegativeReals)
 
 # Variables
-model.x = Var(model.D, model.C, model.V, domain=Binary)
+model.x = Var(model.A, domain=Binary)
 
 # Función de costo
 def cost_function(model):
-    total_cost = 0
-    for d in model.D:
-        for c in model.C:
-            for v in model.V:
-                distance_cost = freight_rate[v] * model.distances[d, c, v] * model.x[d, c, v]
-                time_cost = time_rate[v] * (model.distances[d, c, v] / 60) * model.x[d, c, v]
-                maintenance_cost = daily_maintenance[v] * model.x[d, c, v]
-                total_cost += distance_cost + time_cost + maintenance_cost
-    return total_cost
+    return sum(model.cost[a] * model.x[a] for a in model.A)
 
 model.obj = Objective(rule=cost_function, sense=minimize)
 
-# Restricción de capacidad
+# Restricción de capacidad (las de rango, ventana de tiempo y zona se cumplen por construcción de model.A)
 def capacity_constraint(model, c):
-    return sum(model.x[d, c, v] * model.capacity[v] for d in model.D for v in model.V) >= 1
+    if not client_options[c]:
+        return Constraint.Infeasible
+    return sum(model.x[a] * model.capacity[a[2]] for a in client_options[c]) >= 1
 
 model.capacity_constraint = Constraint(model.C, rule=capacity_constraint)
 
-# Restricción de rango
-def range_constraint(model, d, c, v):
-    return model.distances[d, c, v] * model.x[d, c, v] <= model.range[v]
-
-model.range_constraint = Constraint(model.D, model.C, model.V, rule=range_constraint)
-
 # Resolver el modelo
-opt = SolverFactory('glpk')
-results = opt.solve(model)
+results = resolver_modelo(model, 'glpk')
 
 # Mostrar resultados
 print("Costo total:", model.obj())
-for d in model.D:
-    for c in model.C:
-        for v in model.V:
-            if model.x[d, c, v].value > 0.5:
-                print(f"Depot {d} entrega al Cliente {c} usando el Vehículo {v}")
-
-# Mostrar matriz de costos
-cost_matrix = []
-for d in model.D:
-    for c in model.C:
-        for v in model.V:
-            distance_cost = freight_rate[v] * model.distances[d, c, v]
-            time_cost = time_rate[v] * (model.distances[d, c, v] / 60)
-            maintenance_cost = daily_maintenance[v]
-            total_cost = distance_cost + time_cost + maintenance_cost
-            cost_matrix.append([d, c, v, total_cost])
-
-cost_df = pd.DataFrame(cost_matrix, columns=["DepotID", "ClientID", "VehicleType", "TotalCost"])
-print("\nMatriz de Costos:")
-print(cost_df)
+for d, c, v in model.A:
+    if model.x[d, c, v].value > 0.5:
+        print(f"Depot {d} entrega al Cliente {c} usando el Vehículo {v}")
+
+# Reporte de las opciones más baratas por cliente
+cost_df = reporte_top_k(costs, keep, depot_ids, client_ids, vehicle_types, k=TOP_K)
+print(f"\nTop {TOP_K} de costos por cliente:")
+print(cost_df.to_string(index=False))
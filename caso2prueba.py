@@ -1,7 +1,9 @@
 import pandas as pd
 from pyomo.environ import *
 from pyomo.opt import SolverFactory
-from math import radians, sin, cos, sqrt, atan2
+from resolucion import resolver_modelo
+import numpy as np
+from costos import freight_rate, time_rate, daily_maintenance, haversine_matriz, tensor_costos, filtrar_dominadas, reporte_top_k
 
 # Leer los archivos
 clients = pd.read_csv("vrp_case_data/case_2_cost/clients.csv")
@@ -11,10 +13,8 @@ vehicles = pd.read_csv("vrp_case_data/case_2_cost/vehicles.csv")
 # Normalizar los nombres de los vehículos para evitar inconsistencias
 vehicles["VehicleType"] = vehicles["VehicleType"].str.strip().str.title()
 
-# Diccionarios de costos ajustados
-freight_rate = {"Gas Car": 5000, "Drone": 500, "Ev": 4000}
-time_rate = {"Gas Car": 500, "Drone": 500, "Ev": 500}
-daily_maintenance = {"Gas Car": 30000, "Drone": 3000, "Ev": 21000}
+# Número de opciones por cliente en el reporte de costos
+TOP_K = 3
 
 # Crear el modelo
 model = ConcreteModel()
@@ -24,83 +24,65 @@ model.D = Set(initialize=depots["DepotID"].unique())
 model.C = Set(initialize=clients["ClientID"].unique())
 model.V = Set(initialize=vehicles["VehicleType"].unique())
 
-# Función para calcular distancias usando la fórmula del Haversine
-def haversine(lat1, lon1, lat2, lon2):
-    R = 6371  # Radio de la Tierra en kilómetros
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat / 2)**2 + cos(lat1) * cos(lat2) * sin(dlon / 2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c  # Distancia en kilómetros
-
-# Inicializar las distancias entre cada depósito y cliente
-def initialize_distances(model, d, c):
-    depot = depots.loc[depots["DepotID"] == d]
-    client = clients.loc[clients["ClientID"] == c]
-    depot_coords = (depot["Latitude"].iloc[0], depot["Longitude"].iloc[0])
-    client_coords = (client["Latitude"].iloc[0], client["Longitude"].iloc[0])
-    return haversine(depot_coords[0], depot_coords[1], client_coords[0], client_coords[1])
-
-model.distances = Param(model.D, model.C, initialize=initialize_distances, within=NonNegativeReals)
+# Identificadores en el orden de las filas de los datos (ejes de las matrices)
+depot_ids = depots["DepotID"].tolist()
+client_ids = clients["ClientID"].tolist()
+vehicle_types = list(model.V)
+
+# Distancias Haversine entre todos los depósitos y clientes, repetidas para cada tipo de vehículo
+distances = haversine_matriz(depots["Latitude"], depots["Longitude"], clients["Latitude"], clients["Longitude"])
+distances = np.broadcast_to(distances[:, :, None], distances.shape + (len(vehicle_types),))
 
 # Parámetros
 model.capacity = Param(model.V, initialize={v: vehicles.loc[vehicles["VehicleType"] == v, "Capacity"].iloc[0] for v in model.V})
 model.range = Param(model.V, initialize={v: vehicles.loc[vehicles["VehicleType"] == v, "Range"].iloc[0] for v in model.V})
 
+# Tensor de costos calculado una sola vez (tiempo asumiendo 60 km/h promedio)
+costs = tensor_costos(distances, distances / 60, vehicle_types, freight_rate, time_rate, daily_maintenance)
+
+# Solo las opciones dentro del rango del vehículo y no dominadas se convierten en variables
+capacities = np.array([model.capacity[v] for v in vehicle_types])
+ranges = np.array([model.range[v] for v in vehicle_types])
+keep = filtrar_dominadas(costs, distances <= ranges, capacities)
+
+options = {}
+for i, j, k in zip(*np.nonzero(keep)):
+    options[depot_ids[i], client_ids[j], vehicle_types[k]] = float(costs[i, j, k])
+
+client_options = {c: [] for c in model.C}
+for d, c, v in options:
+    client_options[c].append((d, c, v))
+
+model.A = Set(initialize=list(options), dimen=3, doc="Opciones (depósito, cliente, vehículo) no dominadas")
+model.cost = Param(model.A, initialize=options, within=NonNegativeReals)
+
 # Variables
-model.x = Var(model.D, model.C, model.V, domain=Binary)
+model.x = Var(model.A, domain=Binary)
 
 # Función de costo
 def cost_function(model):
-    total_cost = 0
-    for d in model.D:
-        for c in model.C:
-            for v in model.V:
-                distance_cost = freight_rate[v] * model.distances[d, c] * model.x[d, c, v]
-                time_cost = time_rate[v] * (model.distances[d, c] / 60) * model.x[d, c, v]  # Asumiendo 60 km/h promedio
-                maintenance_cost = daily_maintenance[v] * model.x[d, c, v]
-                total_cost += distance_cost + time_cost + maintenance_cost
-    return total_cost
+    return sum(model.cost[a] * model.x[a] for a in model.A)
 
 model.obj = Objective(rule=cost_function, sense=minimize)
 
-# Restricción de capacidad
+# Restricción de capacidad (la restricción de rango se cumple por construcción de model.A)
 def capacity_constraint(model, c):
-    return sum(model.x[d, c, v] * model.capacity[v] for d in model.D for v in model.V) >= 1
+    if not client_options[c]:
+        return Constraint.Infeasible
+    return sum(model.x[a] * model.capacity[a[2]] for a in client_options[c]) >= 1
 
 model.capacity_constraint = Constraint(model.C, rule=capacity_constraint)
 
-# Restricción de rango
-def range_constraint(model, d, c, v):
-    return model.distances[d, c] * model.x[d, c, v] <= model.range[v]
-
-model.range_constraint = Constraint(model.D, model.C, model.V, rule=range_constraint)
-
 # Resolver el modelo
-opt = SolverFactory('glpk')
-results = opt.solve(model)
+results = resolver_modelo(model, 'glpk')
 
 # Mostrar resultados
 print("Costo total:", model.obj())
-for d in model.D:
-    for c in model.C:
-        for v in model.V:
-            if model.x[d, c, v].value > 0.5:
-                print(f"Depot {d} entrega al Cliente {c} usando el Vehículo {v}")
-
-# Generar la matriz de costos
-cost_matrix = []
-for d in model.D:
-    for c in model.C:
-        for v in model.V:
-            distance_cost = freight_rate[v] * model.distances[d, c]
-            time_cost = time_rate[v] * (model.distances[d, c] / 60)
-            maintenance_cost = daily_maintenance[v]
-            total_cost = distance_cost + time_cost + maintenance_cost
-            cost_matrix.append([d, c, v, total_cost])
-
-# Convertir la matriz en un DataFrame para mejor visualización
-cost_df = pd.DataFrame(cost_matrix, columns=["DepotID", "ClientID", "VehicleType", "TotalCost"])
-print("\nMatriz de Costos:")
-print(cost_df)
+for d, c, v in model.A:
+    if model.x[d, c, v].value > 0.5:
+        print(f"Depot {d} entrega al Cliente {c} usando el Vehículo {v}")
+
+# Reporte de las opciones más baratas por cliente
+cost_df = reporte_top_k(costs, keep, depot_ids, client_ids, vehicle_types, k=TOP_K)
+print(f"\nTop {TOP_K} de costos por cliente:")
+print(cost_df.to_string(index=False))
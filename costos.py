@@ -0,0 +1,142 @@
+import requests
+import numpy as np
+import pandas as pd
+
+# Diccionarios de costos ajustados del caso de costos (caso2.py, caso2prueba.py y multidia.py)
+freight_rate = {"Gas Car": 5000, "Drone": 500, "Ev": 4000}
+time_rate = {"Gas Car": 500, "Drone": 500, "Ev": 500}
+daily_maintenance = {"Gas Car": 30000, "Drone": 3000, "Ev": 21000}
+
+# Vehículos que usan la red vial (OSRM); los demás vuelan en línea recta
+vehiculos_terrestres = ["Gas Car", "Ev"]
+
+# Velocidades promedio en km/h: drones en línea recta y vehículos terrestres cuando no se usa OSRM
+drone_speed = 60
+ground_speed = 30
+
+
+# Función para obtener las distancias usando OSRM
+def osrm_distance(coords):
+    """
+    Calcula las distancias y duraciones usando el servicio OSRM para vehículos terrestres.
+    """
+    coords_str = ';'.join([f"{lon},{lat}" for lon, lat in coords])
+
+    url = f"https://router.project-osrm.org/table/v1/driving/{coords_str}"
+    params = {
+        'sources': ';'.join(map(str, range(len(coords)))),
+        'destinations': ';'.join(map(str, range(len(coords)))),
+        'annotations': 'distance,duration'
+    }
+
+    response = requests.get(url, params=params)
+
+    if response.status_code != 200:
+        raise RuntimeError(f"OSRM request failed: {response.status_code}, {response.text}")
+
+    data = response.json()
+    return np.array(data['distances'])/1000, np.array(data['durations'])/60
+
+
+# Función Haversine vectorizada: distancias (km) entre cada punto del primer grupo y cada punto del segundo
+def haversine_matriz(lat1, lon1, lat2, lon2):
+    R = 6371  # Radio de la Tierra en kilómetros
+    lat1, lon1 = np.radians(np.asarray(lat1, dtype=float))[:, None], np.radians(np.asarray(lon1, dtype=float))[:, None]
+    lat2, lon2 = np.radians(np.asarray(lat2, dtype=float))[None, :], np.radians(np.asarray(lon2, dtype=float))[None, :]
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return R * c
+
+
+def tensor_costos(distancias, tiempos, tipos, freight_rate, time_rate, daily_maintenance):
+    """
+    Calcula una sola vez el tensor de costos D×C×V a partir de las matrices de distancia y
+    tiempo (D×C×V) y de las tarifas por tipo de vehículo, usando broadcasting sobre el eje V.
+    """
+    flete = np.array([freight_rate[v] for v in tipos], dtype=float)
+    tiempo = np.array([time_rate[v] for v in tipos], dtype=float)
+    mantenimiento = np.array([daily_maintenance[v] for v in tipos], dtype=float)
+    return flete * distancias + tiempo * tiempos + mantenimiento
+
+
+def tensores_viaje(depots, clients, vehicle_types, usar_osrm=True):
+    """
+    Tensores D×C×V de distancias (km) y tiempos de viaje (min). Los vehículos terrestres usan
+    OSRM (o Haversine a ground_speed sin OSRM) y los aéreos Haversine a drone_speed. Las
+    matrices se calculan sobre las ubicaciones únicas de los clientes (LocationID o
+    coordenadas repetidas) y cada cliente toma la columna de su ubicación.
+    """
+    if "LocationID" in clients.columns:
+        columna, _ = pd.factorize(clients["LocationID"])
+    else:
+        columna, _ = pd.factorize(pd.Series(list(zip(clients["Longitude"], clients["Latitude"]))))
+    ubicaciones = clients.groupby(columna, sort=True)[["Longitude", "Latitude"]].first()
+
+    haversine_distances = haversine_matriz(depots["Latitude"], depots["Longitude"], ubicaciones["Latitude"], ubicaciones["Longitude"])
+    if usar_osrm:
+        all_coords = list(zip(depots["Longitude"], depots["Latitude"])) + list(zip(ubicaciones["Longitude"], ubicaciones["Latitude"]))
+        osrm_distance_matrix, osrm_duration_matrix = osrm_distance(all_coords)
+        ground_distances = osrm_distance_matrix[:len(depots), len(depots):]
+        ground_durations = osrm_duration_matrix[:len(depots), len(depots):]
+    else:
+        ground_distances = haversine_distances
+        ground_durations = haversine_distances / ground_speed * 60
+    air_durations = haversine_distances / drone_speed * 60
+
+    ground = [v in vehiculos_terrestres for v in vehicle_types]
+    distances = np.stack([ground_distances if g else haversine_distances for g in ground], axis=2)
+    durations = np.stack([ground_durations if g else air_durations for g in ground], axis=2)
+    return distances[:, columna, :], durations[:, columna, :]
+
+
+def opciones_factibles(distancias, tiempos, rangos, fin_ventana):
+    """
+    Máscara D×C×V de las opciones dentro del rango del vehículo que llegan antes del cierre
+    de la ventana del cliente (si llegan antes de la apertura, esperan).
+    """
+    return (distancias <= np.asarray(rangos)) & (tiempos <= np.asarray(fin_ventana, dtype=float)[None, :, None])
+
+
+def filtrar_dominadas(costos, factible, capacidad):
+    """
+    Devuelve la máscara D×C×V de las opciones que se conservan como variables: las factibles
+    que no están dominadas para su cliente. Una opción está dominada si otra opción factible
+    del mismo cliente cuesta lo mismo o menos y tiene igual o mayor capacidad, siendo
+    estrictamente mejor en alguno de los dos.
+    """
+    D, C, V = costos.shape
+    # Opciones de cada cliente en el orden (depósito, vehículo): matrices C×K con K = D·V
+    costo = np.where(factible, costos, np.inf).transpose(1, 0, 2).reshape(C, D * V)
+    fact = factible.transpose(1, 0, 2).reshape(C, D * V)
+    cap = np.tile(np.asarray(capacidad, dtype=float), D)
+
+    # Comparación por pares [c, i, j]: ¿la opción j domina a la opción i?
+    no_peor = (costo[:, None, :] <= costo[:, :, None]) & (cap[None, :] >= cap[:, None])
+    mejor = (costo[:, None, :] < costo[:, :, None]) | (cap[None, :] > cap[:, None])
+    dominada = (no_peor & mejor & fact[:, None, :]).any(axis=2)
+
+    conservar = fact & ~dominada
+    return conservar.reshape(C, D, V).transpose(1, 0, 2)
+
+
+def reporte_top_k(costos, conservar, depositos, clientes, tipos, k=3):
+    """
+    Reporte en columnas de las k opciones más baratas de cada cliente entre las conservadas.
+    """
+    D, C, V = costos.shape
+    costo = np.where(conservar, costos, np.inf).transpose(1, 0, 2).reshape(C, D * V)
+    orden = np.argsort(costo, axis=1, kind="stable")[:, :k]
+    mejores = np.take_along_axis(costo, orden, axis=1)
+    validas = np.isfinite(mejores)
+
+    fila_cliente, rango = np.nonzero(validas)
+    opcion = orden[fila_cliente, rango]
+    return pd.DataFrame({
+        "ClientID": np.asarray(clientes)[fila_cliente],
+        "Rank": rango + 1,
+        "DepotID": np.asarray(depositos)[opcion // V],
+        "VehicleType": np.asarray(tipos)[opcion % V],
+        "TotalCost": mejores[validas],
+    })
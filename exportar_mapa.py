@@ -0,0 +1,259 @@
+import os
+import re
+import json
+import glob
+import argparse
+import numpy as np
+import pandas as pd
+
+# Datos del caso que corresponde a cada archivo de rutas
+casos = {
+    "grupo8-caso-escenarioprueba-1-ruta.csv": "vrp_case_data/case_1_base",
+    "grupo8-caso-escenarioprueba-3-ruta.csv": "vrp_case_data/case_3_supply_limits",
+    "grupo8-caso-escenarioprueba-4-ruta.csv": "vrp_case_data/case_4_multi_product",
+    "grupo8-caso-especial-1-ruta.csv": "vrp_case_data/case_5_recharge_nodes",
+}
+# Las rutas de alns.py llevan en el nombre la carpeta del caso: grupo8-alns-<carpeta>-ruta.csv
+patron_alns = re.compile(r"^grupo8-alns-(.+)-ruta\.csv$")
+
+# Parámetros de la exportación
+TAMANO_LOTE = 500          # Rutas por archivo GeoJSON
+TOLERANCIA = 1e-4          # Tolerancia de simplificación en grados (~11 m)
+DECIMALES = 5              # Precisión de las coordenadas (~1 m)
+RADIO_CLUSTER = 60         # Radio de agrupación de marcadores en píxeles
+ZOOM_MIN, ZOOM_MAX = 8, 16  # Por encima de ZOOM_MAX se muestran las paradas individuales
+
+
+def carpeta_caso(nombre):
+    """
+    Carpeta de datos del caso de un archivo de rutas, o None si no se reconoce.
+    """
+    if nombre in casos:
+        return casos[nombre]
+    encontrado = patron_alns.match(nombre)
+    if encontrado is not None:
+        return os.path.join("vrp_case_data", encontrado.group(1))
+    return None
+
+
+def leer_coordenadas(carpeta):
+    """
+    Diccionario nodo -> (lon, lat) con los mismos identificadores que usan los modelos.
+    """
+    coordenadas = {}
+    for archivo, columna, prefijo in [("Clients.csv", "ClientID", "NCliente"),
+                                      ("Depots.csv", "DepotID", "NBodega"),
+                                      ("RechargeNodes.csv", "RechargeNodeID", "NRecarga")]:
+        ruta = os.path.join(carpeta, archivo)
+        if os.path.exists(ruta):
+            df = pd.read_csv(ruta)
+            for i, lon, lat in zip(df[columna], df["Longitude"], df["Latitude"]):
+                coordenadas[f"{prefijo}{i}"] = (lon, lat)
+    return coordenadas
+
+
+def leer_arcos(ruta):
+    """
+    Arcos (vehículo, origen, destino) de un archivo de rutas en cualquiera de los dos formatos.
+    """
+    df = pd.read_csv(ruta)
+    if "ID-Depot" in df.columns:
+        # Asignaciones depósito -> cliente del escenario base
+        origenes = "NBodega" + df["ID-Depot"].astype(str)
+        destinos = "NCliente" + df["ID-Cliente"].astype(str)
+    else:
+        origenes, destinos = df["ID-Origen"].astype(str), df["ID-Destino"].astype(str)
+    return list(zip(df["ID-Vehiculo"], origenes, destinos))
+
+
+def encadenar(arcos):
+    """
+    Une los arcos de cada vehículo en secuencias de nodos, empezando por los nodos sin
+    arcos de entrada para que cada ruta se dibuje como una sola polilínea.
+    """
+    secuencias = []
+    for vehiculo in dict.fromkeys(v for v, _, _ in arcos):
+        sucesores = {}
+        entradas = set()
+        for v, o, d in arcos:
+            if v == vehiculo:
+                sucesores.setdefault(o, []).append(d)
+                entradas.add(d)
+        inicios = [o for o in sucesores if o not in entradas] + list(sucesores)
+        for inicio in inicios:
+            while sucesores.get(inicio):
+                secuencia = [inicio]
+                actual = inicio
+                while sucesores.get(actual):
+                    actual = sucesores[actual].pop()
+                    secuencia.append(actual)
+                secuencias.append((vehiculo, secuencia))
+    return secuencias
+
+
+def simplificar(puntos, tolerancia=TOLERANCIA):
+    """
+    Douglas-Peucker iterativo: conserva los extremos y los vértices que se alejan más de la
+    tolerancia del segmento que los reemplazaría.
+    """
+    n = len(puntos)
+    if n < 3:
+        return puntos
+    conservar = np.zeros(n, dtype=bool)
+    conservar[[0, -1]] = True
+    pila = [(0, n - 1)]
+    while pila:
+        i, j = pila.pop()
+        if j - i < 2:
+            continue
+        a, b = puntos[i], puntos[j]
+        intermedios = puntos[i + 1:j]
+        segmento = b - a
+        largo = np.hypot(*segmento)
+        if largo == 0:
+            distancias = np.hypot(*(intermedios - a).T)
+        else:
+            relativos = intermedios - a
+            distancias = np.abs(segmento[0] * relativos[:, 1] - segmento[1] * relativos[:, 0]) / largo
+        k = int(np.argmax(distancias))
+        if distancias[k] > tolerancia:
+            k += i + 1
+            conservar[k] = True
+            pila.extend([(i, k), (k, j)])
+    return puntos[conservar]
+
+
+def agrupar(puntos, zoom, radio=RADIO_CLUSTER):
+    """
+    Agrupa los puntos en una grilla cuyo tamaño de celda equivale a `radio` píxeles en el
+    nivel de zoom dado. Devuelve el centroide y la cantidad de puntos de cada grupo.
+    """
+    celda = 360 / (256 * 2**zoom) * radio
+    claves = np.floor(puntos / celda).astype(np.int64)
+    _, grupo = np.unique(claves, axis=0, return_inverse=True)
+    grupo = grupo.ravel()
+    cantidad = np.bincount(grupo)
+    centroides = np.column_stack([np.bincount(grupo, weights=puntos[:, 0]),
+                                  np.bincount(grupo, weights=puntos[:, 1])]) / cantidad[:, None]
+    return centroides, cantidad
+
+
+def escribir_geojson(ruta, features):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": features}, f, separators=(",", ":"))
+
+
+def exportar(archivos, salida):
+    os.makedirs(salida, exist_ok=True)
+
+    lineas = []
+    paradas = {}
+    for archivo in archivos:
+        nombre = os.path.basename(archivo)
+        carpeta = carpeta_caso(nombre)
+        if carpeta is None or not os.path.isdir(carpeta):
+            print(f"Sin datos de caso para {nombre}, se omite")
+            continue
+        coordenadas = leer_coordenadas(carpeta)
+        for vehiculo, secuencia in encadenar(leer_arcos(archivo)):
+            puntos = np.array([coordenadas[n] for n in secuencia], dtype=float)
+            for n in secuencia:
+                paradas[nombre, n] = coordenadas[n]
+            lineas.append({
+                "type": "Feature",
+                "properties": {"vehiculo": vehiculo, "archivo": nombre, "paradas": len(secuencia)},
+                "geometry": {"type": "LineString", "coordinates": np.round(simplificar(puntos), DECIMALES).tolist()},
+            })
+
+    # Rutas en lotes de colecciones GeoJSON
+    lotes = []
+    for k in range(0, len(lineas), TAMANO_LOTE):
+        lote = f"rutas_{k // TAMANO_LOTE}.geojson"
+        escribir_geojson(os.path.join(salida, lote), lineas[k:k + TAMANO_LOTE])
+        lotes.append(lote)
+
+    # Marcadores agrupados por nivel de zoom
+    puntos = np.array(list(paradas.values()), dtype=float).reshape(-1, 2)
+    for zoom in range(ZOOM_MIN, ZOOM_MAX + 1):
+        centroides, cantidad = agrupar(puntos, zoom)
+        escribir_geojson(os.path.join(salida, f"paradas_z{zoom}.geojson"), [
+            {"type": "Feature", "properties": {"n": int(n)},
+             "geometry": {"type": "Point", "coordinates": np.round(c, DECIMALES).tolist()}}
+            for c, n in zip(centroides, cantidad)
+        ])
+    escribir_geojson(os.path.join(salida, "paradas.geojson"), [
+        {"type": "Feature", "properties": {"id": n},
+         "geometry": {"type": "Point", "coordinates": np.round(c, DECIMALES).tolist()}}
+        for (_, n), c in paradas.items()
+    ])
+
+    centro = puntos.mean(axis=0).tolist() if len(puntos) else [-74.08, 4.65]
+    with open(os.path.join(salida, "mapa.html"), "w", encoding="utf-8") as f:
+        f.write(plantilla_html % {
+            "lotes": json.dumps(lotes),
+            "lat": centro[1], "lon": centro[0],
+            "zmin": ZOOM_MIN, "zmax": ZOOM_MAX,
+        })
+    print(f"Mapa generado: {os.path.join(salida, 'mapa.html')} ({len(lineas)} rutas, {len(paradas)} paradas)")
+
+
+# Mapa Leaflet con renderizado en canvas que carga los lotes y cambia la capa de marcadores con el zoom
+plantilla_html = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8"/>
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css"/>
+<script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js"></script>
+<style>html, body, #map {width: 100%%; height: 100%%; margin: 0; padding: 0;}</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+var map = L.map("map", {preferCanvas: true}).setView([%(lat)f, %(lon)f], 12);
+L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png", {maxZoom: 19, attribution: "&copy; OpenStreetMap"}).addTo(map);
+
+var colores = {};
+function color(vehiculo) {
+    if (!(vehiculo in colores)) colores[vehiculo] = "hsl(" + (Object.keys(colores).length * 67 %% 360) + ",70%%,45%%)";
+    return colores[vehiculo];
+}
+
+%(lotes)s.forEach(function (lote) {
+    fetch(lote).then(function (r) { return r.json(); }).then(function (datos) {
+        L.geoJSON(datos, {style: function (f) { return {color: color(f.properties.vehiculo), weight: 2}; }}).addTo(map);
+    });
+});
+
+var cache = {}, capa = null;
+function archivoParadas(zoom) {
+    if (zoom > %(zmax)d) return "paradas.geojson";
+    return "paradas_z" + Math.max(zoom, %(zmin)d) + ".geojson";
+}
+function actualizarParadas() {
+    var archivo = archivoParadas(map.getZoom());
+    var cargar = cache[archivo] ? Promise.resolve(cache[archivo]) :
+        fetch(archivo).then(function (r) { return r.json(); }).then(function (d) { return cache[archivo] = d; });
+    cargar.then(function (datos) {
+        if (archivo !== archivoParadas(map.getZoom())) return;
+        if (capa) map.removeLayer(capa);
+        capa = L.geoJSON(datos, {pointToLayer: function (f, latlng) {
+            var n = f.properties.n || 1;
+            var marcador = L.circleMarker(latlng, {radius: 4 + 2 * Math.log2(n), weight: 1, fillOpacity: 0.7});
+            return marcador.bindTooltip(f.properties.id || (n + " paradas"));
+        }}).addTo(map);
+    });
+}
+map.on("zoomend", actualizarParadas);
+actualizarParadas();
+</script>
+</body>
+</html>
+"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporta las rutas a un mapa liviano con GeoJSON por lotes")
+    parser.add_argument("archivos", nargs="*", default=sorted(glob.glob("rutas/*.csv")))
+    parser.add_argument("--salida", default="mapa")
+    opciones = parser.parse_args()
+    exportar(opciones.archivos, opciones.salida)
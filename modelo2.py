@@ -1,5 +1,6 @@
 from pyomo.environ import *
 import pandas as pd
+from resolucion import resolver_modelo
 from math import radians, sin, cos, sqrt, atan2
 
 # lectura datos
@@ -113,8 +114,7 @@ def capacidad_deposito_rule(model, d):
 model.capacidad_deposito = Constraint(model.D, rule=capacidad_deposito_rule)
 
 # Solución
-solver = SolverFactory('glpk') 
-solver.solve(model, tee=True)
+resolver_modelo(model, 'glpk', tee=True)
 
 # Lista para almacenar las rutas
 routes = []
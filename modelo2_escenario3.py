@@ -2,6 +2,7 @@
 
 from pyomo.environ import *
 import pandas as pd
+from resolucion import resolver_modelo
 
 # Lectura de datos
 clients_df = pd.read_csv('vrp_case_data/case_3_supply_limits/Clients.csv')
@@ -108,8 +109,7 @@ def depot_capacity_rule(model, d):
 
 
 # Resolución
-solver = SolverFactory('glpk')
-solver.solve(model, tee=True)
+resolver_modelo(model, 'glpk', tee=True)
 
 # Generar rutas con etiquetas
 routes = []
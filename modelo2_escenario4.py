@@ -2,6 +2,7 @@
 
 from pyomo.environ import *
 import pandas as pd
+from resolucion import resolver_modelo
 
 # ------------------
 # Lectura de datos
@@ -151,8 +152,7 @@ model.vehicle_capacity_constraint = Constraint(model.V, rule=vehicle_capacity_ru
 # ------------------
 # Resolución
 # ------------------
-solver = SolverFactory('glpk')
-solver.solve(model, tee=True)
+resolver_modelo(model, 'glpk', tee=True)
 
 # ------------------
 # Guardar resultados
@@ -0,0 +1,170 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from pyomo.environ import *
+from costos import freight_rate, time_rate, daily_maintenance, tensores_viaje, tensor_costos, opciones_factibles, filtrar_dominadas
+from ventanas import leer_ventanas
+from resolucion import resolver_modelo
+
+# Datos compartidos por los procesos de trabajo: se envían una sola vez al crear cada proceso
+_datos = None
+
+
+def preparar_datos(orders, depots, vehicles, usar_osrm=True):
+    """
+    Calcula una sola vez para toda la semana los tensores D×P×V de costos y las opciones no
+    dominadas de cada pedido (P = pedidos). Los días solo toman columnas de estos tensores.
+    """
+    vehicle_types = vehicles["VehicleType"].unique().tolist()
+    distances, durations = tensores_viaje(depots, orders, vehicle_types, usar_osrm)
+    costs = tensor_costos(distances, durations / 60, vehicle_types, freight_rate, time_rate, daily_maintenance)
+
+    capacities = np.array([vehicles.loc[vehicles["VehicleType"] == v, "Capacity"].iloc[0] for v in vehicle_types])
+    ranges = np.array([vehicles.loc[vehicles["VehicleType"] == v, "Range"].iloc[0] for v in vehicle_types])
+    _, window_end = leer_ventanas(orders)
+    feasible = opciones_factibles(distances, durations, ranges, window_end)
+
+    return {
+        "depot_ids": depots["DepotID"].tolist(),
+        "vehicle_types": vehicle_types,
+        "capacities": capacities,
+        "costs": costs,
+        "keep": filtrar_dominadas(costs, feasible, capacities),
+    }
+
+
+def _iniciar_trabajador(datos):
+    global _datos
+    _datos = datos
+
+
+def resolver_dia(tarea):
+    """
+    Resuelve el modelo de costos de caso2.py para los pedidos asignados a un día.
+    """
+    dia, pedidos, solver_name = tarea
+    depot_ids, vehicle_types = _datos["depot_ids"], _datos["vehicle_types"]
+    costs, keep = _datos["costs"], _datos["keep"]
+
+    options = {}
+    for i, j, k in zip(*np.nonzero(keep[:, pedidos, :])):
+        options[depot_ids[i], pedidos[j], vehicle_types[k]] = float(costs[i, pedidos[j], k])
+
+    order_options = {p: [] for p in pedidos}
+    for a in options:
+        order_options[a[1]].append(a)
+    sin_opcion = [p for p in pedidos if not order_options[p]]
+    pedidos = [p for p in pedidos if order_options[p]]
+    if not pedidos:
+        return dia, [], sin_opcion
+
+    model = ConcreteModel()
+    model.P = Set(initialize=pedidos, doc="Pedidos del día")
+    model.A = Set(initialize=list(options), dimen=3, doc="Opciones (depósito, pedido, vehículo) no dominadas")
+    model.cost = Param(model.A, initialize=options, within=NonNegativeReals)
+    model.capacity = Param(model.A, initialize={a: _datos["capacities"][vehicle_types.index(a[2])] for a in options})
+    model.x = Var(model.A, domain=Binary)
+    model.obj = Objective(expr=sum(model.cost[a] * model.x[a] for a in model.A), sense=minimize)
+    model.capacity_constraint = Constraint(
+        model.P, rule=lambda model, p: sum(model.x[a] * model.capacity[a] for a in order_options[p]) >= 1
+    )
+    resolver_modelo(model, solver_name)
+
+    asignaciones = [(d, p, v, options[d, p, v]) for d, p, v in model.A if model.x[d, p, v].value > 0.5]
+    return dia, asignaciones, sin_opcion
+
+
+def asignar_dias(orders, pendientes, dia_actual, ultimo_dia, capacidad_diaria):
+    """
+    Asigna cada pedido pendiente a un día de su ventana [EarliestDay, LatestDay] dentro del
+    horizonte restante. Los pedidos que vencen antes (y, entre ellos, los de ventana más
+    estrecha) se asignan primero, al día menos cargado que no exceda la capacidad diaria de
+    la flota. Los pedidos cuya ventana empieza después del horizonte no se asignan y siguen
+    pendientes.
+    """
+    carga = {dia: 0.0 for dia in range(dia_actual, ultimo_dia + 1)}
+    asignacion = {dia: [] for dia in carga}
+
+    primero = np.maximum(orders["EarliestDay"].to_numpy()[pendientes], dia_actual)
+    ultimo = np.minimum(orders["LatestDay"].to_numpy()[pendientes], ultimo_dia)
+    # Pedidos vencidos: se atienden lo antes posible
+    ultimo = np.maximum(ultimo, primero)
+    demanda = orders["Product"].to_numpy()[pendientes]
+
+    for k in np.lexsort((ultimo - primero, ultimo)):
+        if primero[k] > ultimo_dia:
+            continue
+        dias = range(int(primero[k]), int(ultimo[k]) + 1)
+        dia = min(dias, key=lambda t: (carga[t] + demanda[k] > capacidad_diaria, carga[t]))
+        carga[dia] += demanda[k]
+        asignacion[dia].append(int(pendientes[k]))
+    return asignacion
+
+
+def planear_semana(orders, depots, vehicles, dias=7, procesos=None, solver_name="glpk", usar_osrm=True):
+    """
+    Horizonte rodante: en cada día se reasignan los pedidos pendientes a los días restantes,
+    se resuelven en paralelo los problemas de todos esos días, se fija el plan del día actual
+    y se vuelve a planear el resto con la información actualizada.
+    """
+    orders = orders.reset_index(drop=True)
+    if "EarliestDay" not in orders.columns:
+        orders["EarliestDay"] = 1
+    if "LatestDay" not in orders.columns:
+        orders["LatestDay"] = dias
+    orders["EarliestDay"] = orders["EarliestDay"].fillna(1).astype(int)
+    orders["LatestDay"] = orders["LatestDay"].fillna(dias).astype(int)
+
+    datos = preparar_datos(orders, depots, vehicles, usar_osrm)
+    capacidad_diaria = vehicles["Capacity"].sum()
+
+    plan = []
+    pendientes = np.arange(len(orders))
+    # Pedidos que empiezan después del horizonte: se trasladan al siguiente
+    fuera = orders["EarliestDay"].to_numpy() > dias
+    for p in np.flatnonzero(fuera):
+        print(f"El pedido {p} (cliente {orders.loc[p, 'ClientID']}) empieza el día {orders.loc[p, 'EarliestDay']}, "
+              f"después del horizonte de {dias} días: se traslada al siguiente horizonte")
+    pendientes = pendientes[~fuera]
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador, initargs=(datos,)) as pool:
+        for dia_actual in range(1, dias + 1):
+            if len(pendientes) == 0:
+                break
+            asignacion = asignar_dias(orders, pendientes, dia_actual, dias, capacidad_diaria)
+            tareas = [(dia, pedidos, solver_name) for dia, pedidos in asignacion.items() if pedidos]
+            resultados = {dia: (asignaciones, sin_opcion) for dia, asignaciones, sin_opcion in pool.map(resolver_dia, tareas)}
+
+            asignaciones, sin_opcion = resultados.get(dia_actual, ([], []))
+            for d, p, v, costo in asignaciones:
+                plan.append([dia_actual, p, orders.loc[p, "ClientID"], d, v, costo])
+            for p in sin_opcion:
+                print(f"Día {dia_actual}: el pedido {p} (cliente {orders.loc[p, 'ClientID']}) no tiene opciones factibles")
+
+            fijados = set(asignacion.get(dia_actual, []))
+            pendientes = np.array([p for p in pendientes if p not in fijados], dtype=int)
+            restante = sum(c for dia, (a, _) in resultados.items() if dia != dia_actual for *_, c in a)
+            print(f"Día {dia_actual}: {len(asignaciones)} pedidos fijados, costo estimado del resto de la semana {restante:.2f}")
+
+    return pd.DataFrame(plan, columns=["Dia", "ID-Pedido", "ClientID", "DepotID", "VehicleType", "TotalCost"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Planeación semanal con horizonte rodante")
+    parser.add_argument("--pedidos", default="vrp_case_data/case_2_cost/Clients.csv")
+    parser.add_argument("--casos", default="vrp_case_data/case_2_cost")
+    parser.add_argument("--dias", type=int, default=7)
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--solver", default="glpk")
+    parser.add_argument("--sin-osrm", action="store_true", help="Usar distancias Haversine a velocidad promedio (costos.ground_speed) también para vehículos terrestres")
+    opciones, _ = parser.parse_known_args()
+
+    orders = pd.read_csv(opciones.pedidos)
+    depots = pd.read_csv(f"{opciones.casos}/Depots.csv")
+    vehicles = pd.read_csv(f"{opciones.casos}/Vehicles.csv")
+    vehicles["VehicleType"] = vehicles["VehicleType"].str.strip().str.title()
+
+    plan_df = planear_semana(orders, depots, vehicles, opciones.dias, opciones.procesos, opciones.solver, not opciones.sin_osrm)
+    output_file = "./rutas/grupo8-caso-2-plan-semanal.csv"
+    plan_df.to_csv(output_file, index=False)
+    print(f"Archivo generado: {output_file}")
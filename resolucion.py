@@ -0,0 +1,165 @@
+import re
+import sys
+import time
+import argparse
+from pyomo.environ import *
+from pyomo.opt import SolverFactory, TerminationCondition
+
+# Nombre de la opción de gap relativo según el solver
+opciones_gap = {"glpk": "mipgap", "cbc": "ratioGap", "highs": "mip_rel_gap", "appsi_highs": "mip_rel_gap", "gurobi": "MIPGap", "cplex": "mipgap"}
+
+# Líneas del log que reportan incumbente y cota durante el branch and bound
+# GLPK: "+   150: mip =   1.234000000e+03 >=   1.100000000e+03  10.9% (12; 0)"
+patron_glpk = re.compile(r"^\+\s*\d+: mip =\s*([-+\d.eE]+)\s*[<>]=\s*([-+\d.eE]+|[-+]?inf)\s")
+# CBC: "Cbc0010I After 100 nodes, 5 on tree, 1234 best solution, best possible 1100 (0.52 seconds)"
+patron_cbc = re.compile(r"^Cbc00\d\dI .*?([-+\d.eE]+) best solution, best possible ([-+\d.eE]+)")
+# Valor que los solvers reportan cuando aún no hay incumbente o cota (CBC: 1e+50, GLPK: inf)
+SIN_VALOR = 1e50
+
+
+def leer_opciones():
+    """
+    Lee de la línea de comandos las opciones del modo de cota rápida.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--cota-rapida", action="store_true")
+    parser.add_argument("--gap", type=float, default=None)
+    opciones, _ = parser.parse_known_args()
+    return opciones
+
+
+def calcular_gap(incumbente, cota):
+    if incumbente is None or cota is None:
+        return None
+    return abs(incumbente - cota) / max(abs(incumbente), 1e-10)
+
+
+class EscuchaLog:
+    """
+    Flujo que reenvía la salida del solver y convierte cada línea de progreso en un evento.
+    """
+
+    def __init__(self, destino, patron, callback, inicio, mostrar=True):
+        self.destino = destino
+        self.patron = patron
+        self.callback = callback
+        self.inicio = inicio
+        self.mostrar = mostrar
+        self.pendiente = ""
+        self.ultimo = None
+
+    def write(self, texto):
+        if self.mostrar:
+            self.destino.write(texto)
+        self.pendiente += texto
+        *lineas, self.pendiente = self.pendiente.split("\n")
+        for linea in lineas:
+            self.procesar(linea)
+        return len(texto)
+
+    def procesar(self, linea):
+        encontrado = self.patron.search(linea) if self.patron is not None else None
+        if encontrado is None:
+            return
+        try:
+            incumbente, cota = float(encontrado.group(1)), float(encontrado.group(2))
+        except ValueError:
+            return
+        incumbente = None if abs(incumbente) >= SIN_VALOR else incumbente
+        cota = None if abs(cota) >= SIN_VALOR else cota
+        if incumbente is None and cota is None:
+            return
+        if self.ultimo == (incumbente, cota):
+            return
+        self.ultimo = (incumbente, cota)
+        # El callback escribe en la salida real, no en este flujo (que descarta el texto si mostrar=False)
+        salida, sys.stdout = sys.stdout, self.destino
+        try:
+            self.callback({
+                "evento": "progreso",
+                "incumbente": incumbente,
+                "cota": cota,
+                "gap": calcular_gap(incumbente, cota),
+                "tiempo": time.time() - self.inicio,
+            })
+        finally:
+            sys.stdout = salida
+
+    def flush(self):
+        self.destino.flush()
+
+
+def imprimir_evento(evento):
+    print(f"[{evento['evento']}] " + ", ".join(f"{k}={v}" for k, v in evento.items() if k != "evento"))
+
+
+def resolver_modelo(model, solver_name="glpk", timelimit=None, tee=False, cota_rapida=None, gap=None, callback=None):
+    """
+    Resuelve el modelo. En modo de cota rápida primero resuelve la relajación lineal para
+    reportar una cota inferior en segundos y luego el MIP con un gap relativo objetivo,
+    emitiendo los eventos de incumbente y cota a medida que el solver los reporta.
+    """
+    opciones = leer_opciones()
+    cota_rapida = opciones.cota_rapida if cota_rapida is None else cota_rapida
+    gap = opciones.gap if gap is None else gap
+
+    solver = SolverFactory(solver_name)
+    argumentos = {"tee": tee}
+    if timelimit is not None:
+        argumentos["timelimit"] = timelimit
+
+    # Gap relativo objetivo: el solver se detiene al alcanzar una solución "suficientemente buena"
+    if gap is not None:
+        if solver_name not in opciones_gap:
+            raise ValueError(f"El solver {solver_name} no admite --gap")
+        solver.options[opciones_gap[solver_name]] = gap
+
+    if not cota_rapida:
+        # Comportamiento original: una sola resolución del MIP
+        return solver.solve(model, **argumentos)
+
+    callback = callback or imprimir_evento
+    inicio = time.time()
+
+    # Relajación lineal sobre una copia para no alterar el dominio de las variables del modelo
+    relajado = model.clone()
+    TransformationFactory("core.relax_integer_vars").apply_to(relajado)
+    resultado_lp = SolverFactory(solver_name).solve(relajado, load_solutions=False)
+    estado_lp = resultado_lp.solver.termination_condition
+    cota_lp = None
+    if estado_lp == TerminationCondition.optimal:
+        relajado.solutions.load_from(resultado_lp)
+        cota_lp = value(next(relajado.component_data_objects(Objective, active=True)))
+    callback({"evento": "cota_lp", "estado": str(estado_lp), "cota": cota_lp, "tiempo": time.time() - inicio})
+
+    # Los solvers por línea de comandos escriben el progreso en sys.stdout cuando tee=True
+    patron = {"glpk": patron_glpk, "cbc": patron_cbc}.get(solver_name)
+    if patron is None:
+        print(f"El solver {solver_name} no reporta progreso legible: solo se emiten los eventos cota_lp y fin")
+    salida = sys.stdout
+    sys.stdout = EscuchaLog(salida, patron, callback, inicio, mostrar=tee)
+    try:
+        argumentos["tee"] = True
+        results = solver.solve(model, **argumentos)
+    finally:
+        sys.stdout = salida
+
+    objetivo = next(model.component_data_objects(Objective, active=True))
+    cota = results.problem.lower_bound if objetivo.sense == minimize else results.problem.upper_bound
+    try:
+        cota = float(cota)
+    except (TypeError, ValueError):
+        cota = None
+    try:
+        incumbente = value(objetivo)
+    except ValueError:
+        incumbente = None
+    callback({
+        "evento": "fin",
+        "estado": str(results.solver.termination_condition),
+        "incumbente": incumbente,
+        "cota": cota,
+        "gap": calcular_gap(incumbente, cota),
+        "tiempo": time.time() - inicio,
+    })
+    return results
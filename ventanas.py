@@ -0,0 +1,88 @@
+import math
+
+
+def leer_ventanas(clients, horizonte=math.inf):
+    """
+    Lee las ventanas de tiempo opcionales de Clients.csv (columnas TimeWindowStart y
+    TimeWindowEnd, en minutos desde el inicio de la jornada). Los clientes sin ventana
+    pueden atenderse en cualquier momento del horizonte.
+    """
+    inicio = [0.0] * len(clients)
+    fin = [horizonte] * len(clients)
+    if "TimeWindowStart" in clients.columns:
+        inicio = [0.0 if math.isnan(t) else float(t) for t in clients["TimeWindowStart"]]
+    if "TimeWindowEnd" in clients.columns:
+        fin = [horizonte if math.isnan(t) else float(t) for t in clients["TimeWindowEnd"]]
+    return inicio, fin
+
+
+class RutaVentanas:
+    """
+    Ruta depósito → clientes → depósito con ventanas de tiempo.
+
+    Mantiene hacia adelante el inicio de servicio en cada posición y hacia atrás la holgura
+    (cuánto puede retrasarse ese inicio sin violar ninguna ventana posterior), de modo que
+    verificar si una inserción o eliminación es factible cuesta O(1). Los arreglos se
+    recalculan en O(n) solo cuando el movimiento se aplica.
+    """
+
+    def __init__(self, nodos, tiempos, inicio, fin, servicio=None):
+        # nodos: índices globales, con el depósito al principio y al final
+        # tiempos[i][j]: tiempo de viaje en minutos; inicio/fin/servicio: por índice global
+        self.nodos = list(nodos)
+        self.tiempos = tiempos
+        self.inicio = inicio
+        self.fin = fin
+        self.servicio = servicio if servicio is not None else [0.0] * len(inicio)
+        self.actualizar()
+
+    def actualizar(self):
+        nodos, t, e, l, s = self.nodos, self.tiempos, self.inicio, self.fin, self.servicio
+        n = len(nodos)
+
+        # Tiempos hacia adelante: inicio de servicio más temprano en cada posición (se espera si se llega antes)
+        self.llegada = [0.0] * n
+        self.llegada[0] = e[nodos[0]]
+        for k in range(1, n):
+            anterior, actual = nodos[k - 1], nodos[k]
+            self.llegada[k] = max(e[actual], self.llegada[k - 1] + s[anterior] + t[anterior][actual])
+        self.factible = all(self.llegada[k] <= l[nodos[k]] for k in range(n))
+
+        # Inicio más tardío hacia atrás y holgura de cada posición
+        tardio = [0.0] * n
+        tardio[-1] = l[nodos[-1]]
+        for k in range(n - 2, -1, -1):
+            actual, siguiente = nodos[k], nodos[k + 1]
+            tardio[k] = min(l[actual], tardio[k + 1] - s[actual] - t[actual][siguiente])
+        self.holgura = [tardio[k] - self.llegada[k] for k in range(n)]
+
+    def puede_insertar(self, nodo, pos):
+        """
+        ¿Es factible insertar el nodo entre las posiciones pos - 1 y pos?
+        """
+        t, e, l, s = self.tiempos, self.inicio, self.fin, self.servicio
+        i, j = self.nodos[pos - 1], self.nodos[pos]
+        llegada_nodo = max(e[nodo], self.llegada[pos - 1] + s[i] + t[i][nodo])
+        if llegada_nodo > l[nodo]:
+            return False
+        llegada_j = max(e[j], llegada_nodo + s[nodo] + t[nodo][j])
+        return llegada_j - self.llegada[pos] <= self.holgura[pos]
+
+    def puede_eliminar(self, pos):
+        """
+        ¿Es factible quitar el nodo en la posición pos? Sin desigualdad triangular
+        (p. ej. con duraciones de OSRM) quitar un nodo puede retrasar a los siguientes.
+        """
+        t, e, s = self.tiempos, self.inicio, self.servicio
+        i, j = self.nodos[pos - 1], self.nodos[pos + 1]
+        llegada_j = max(e[j], self.llegada[pos - 1] + s[i] + t[i][j])
+        return llegada_j - self.llegada[pos + 1] <= self.holgura[pos + 1]
+
+    def insertar(self, nodo, pos):
+        self.nodos.insert(pos, nodo)
+        self.actualizar()
+
+    def eliminar(self, pos):
+        nodo = self.nodos.pop(pos)
+        self.actualizar()
+        return nodo
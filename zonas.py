@@ -0,0 +1,67 @@
+import os
+import numpy as np
+
+# Polígonos de las áreas urbanas
+RUTA_ZONAS = "Proyecto Seneca Libre/GeoSpatialData/AUrb.shp"
+
+
+def cargar_zonas(ruta=RUTA_ZONAS, columna="AUrCodigo"):
+    """
+    Carga los polígonos una sola vez y construye su índice espacial (STRtree).
+    """
+    # geopandas solo se necesita cuando hay reglas de zona
+    import geopandas as gpd
+
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f"No se encontró el shapefile de zonas: {ruta}")
+    zonas = gpd.read_file(ruta)
+    zonas[columna] = zonas[columna].astype(str).str.strip()
+    zonas.sindex  # El índice se construye de forma perezosa; se fuerza aquí para reutilizarlo
+    return zonas
+
+
+def etiquetar_nodos(zonas, longitudes, latitudes, columna="AUrCodigo"):
+    """
+    Etiqueta cada punto con el código de la zona que lo contiene (None si está fuera de
+    todas), con una sola consulta masiva de punto en polígono sobre el índice espacial.
+    """
+    import geopandas as gpd
+
+    puntos = gpd.points_from_xy(longitudes, latitudes, crs="EPSG:4326")
+    if zonas.crs is not None:
+        puntos = puntos.to_crs(zonas.crs)
+
+    idx_puntos, idx_zonas = zonas.sindex.query(puntos, predicate="within")
+    etiquetas = np.full(len(puntos), None, dtype=object)
+    etiquetas[idx_puntos] = zonas[columna].to_numpy()[idx_zonas]
+    return etiquetas
+
+
+def nodos_permitidos(etiquetas, tipos, zonas_prohibidas):
+    """
+    Máscara nodos×vehículos de las combinaciones permitidas. zonas_prohibidas asocia a cada
+    tipo de vehículo un conjunto de códigos de zona donde no puede operar, o "*" para
+    prohibir cualquier zona urbana (p. ej. zonas de no vuelo para drones).
+    """
+    permitido = np.ones((len(etiquetas), len(tipos)), dtype=bool)
+    for k, v in enumerate(tipos):
+        prohibidas = zonas_prohibidas.get(v)
+        if prohibidas is None:
+            continue
+        if prohibidas == "*":
+            permitido[:, k] = [z is None for z in etiquetas]
+        else:
+            permitido[:, k] = [z not in prohibidas for z in etiquetas]
+    return permitido
+
+
+def servicio_depositos(depot_ids, etiquetas_clientes, areas_servicio):
+    """
+    Máscara depósitos×clientes según el área de servicio de cada depósito: un conjunto de
+    códigos de zona que atiende. Los depósitos sin área definida atienden a todos.
+    """
+    permitido = np.ones((len(depot_ids), len(etiquetas_clientes)), dtype=bool)
+    for i, d in enumerate(depot_ids):
+        if d in areas_servicio:
+            permitido[i, :] = [z in areas_servicio[d] for z in etiquetas_clientes]
+    return permitido